@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Kernel DSP compartilhado por audio_sync.py e audio_sync_strobe.py."""
+import numpy as np
+import scipy.fft as sfft
+from scipy.signal import firwin, upfirdn
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba é opcional: sem ele o kernel roda como NumPy puro
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+# --- Bandas (Hz) ---
+BASS_BAND = (40, 150)
+MID_BAND = (200, 3000)
+
+# --- Decimação ---
+# Nada acima de MID_BAND é lido: filtra e decima antes da FFT (44.1 kHz -> 11 kHz, 2048 -> 512 pts)
+DECIMATE = 4
+FIR_TAPS = 31
+
+@njit(cache=True, fastmath=True)
+def process_block(mag, freqs_mid, bass_lo, bass_hi, mid_lo, mid_hi, avg_bass):
+    """Energia do grave, média móvel e posição harmônica num único kernel."""
+    e_bass = mag[bass_lo:bass_hi].sum()
+    new_avg = (avg_bass * 0.99) + (e_bass * 0.01)
+    bass_ratio = e_bass / max(new_avg, 0.1)
+    valid_fft = mag[mid_lo:mid_hi]
+    # sdot sem array temporário (freqs_mid e mag são ambos float32)
+    centroid = np.dot(freqs_mid, valid_fft) / (valid_fft.sum() + 1e-6)
+    harmonic_pos = min(max((centroid - 200) / 2800, 0.0), 1.0)
+    return e_bass, new_avg, bass_ratio, harmonic_pos
+
+def hsv2rgb(h, s, v):
+    """HSV→RGB sem ramificações (fórmula k = (n + 6h) mod 6), igual ao colorsys."""
+    h6 = h * 6.0
+    kr = (5.0 + h6) % 6.0; kg = (3.0 + h6) % 6.0; kb = (1.0 + h6) % 6.0
+    return (v - v * s * max(0.0, min(kr, 4.0 - kr, 1.0)),
+            v - v * s * max(0.0, min(kg, 4.0 - kg, 1.0)),
+            v - v * s * max(0.0, min(kb, 4.0 - kb, 1.0)))
+
+class Spectrum:
+    """Bins, bandas e buffers de FFT pré-alocados para um tamanho de bloco fixo."""
+
+    def __init__(self, n, sr):
+        # Bins e bandas são fixos após abrir o stream: calcula uma vez só.
+        # Só decima se o Nyquist resultante ainda cobre MID_BAND com folga (ex.: não em 22.05 kHz)
+        self.decim = DECIMATE if sr / DECIMATE > 2.2 * MID_BAND[1] else 1
+        if self.decim > 1:
+            # Passa-baixa anti-alias em 0.88 do novo Nyquist; ganho = decim mantém a escala das magnitudes
+            self._fir = (firwin(FIR_TAPS, 0.88 / self.decim) * self.decim).astype(np.float32)
+            self._fir_off = -(-((FIR_TAPS - 1) // 2) // self.decim) # Atraso de grupo, em amostras decimadas
+        # O tamanho da FFT é o next_fast_len do bloco decimado (512 já é potência de 2);
+        # blocos menores entram com zero-padding e o pocketfft nunca cai no Bluestein.
+        n = sfft.next_fast_len(-(-n // self.decim), real=True)
+        self.n_fft = n
+        # float32 de ponta a ponta: evita promoção para float64 nas reduções
+        self.freqs = sfft.rfftfreq(n, self.decim / sr).astype(np.float32)
+        # Bins crescentes: cada banda é uma fatia contígua [lo:hi] do espectro
+        self.bass_lo, self.bass_hi = self._band(BASS_BAND)
+        self.mid_lo, self.mid_hi = self._band(MID_BAND)
+        self.freqs_mid = self.freqs[self.mid_lo:self.mid_hi]
+        # Buffer de entrada persistente: o pocketfft do scipy reaproveita o plano
+        self.fft_in = np.zeros(n, dtype=np.float32)
+        # Magnitudes reaproveitadas a cada bloco via out= (sem alocar no callback)
+        self.mag = np.zeros(n // 2 + 1, dtype=np.float32)
+        # Aquece o JIT aqui para o primeiro bloco real não travar o callback
+        self.features(10.0)
+
+    def _band(self, band):
+        """Índices [lo:hi] dos bins estritamente dentro de (f_lo, f_hi)."""
+        lo = int(np.searchsorted(self.freqs, band[0], side='right'))
+        hi = int(np.searchsorted(self.freqs, band[1], side='left'))
+        return lo, hi
+
+    def transform(self, samples):
+        """Magnitude do rfft de um bloco mono; retorna o buffer interno `mag`."""
+        if self.decim > 1:
+            samples = upfirdn(self._fir, samples, down=self.decim)[self._fir_off:]
+        k = min(len(samples), self.n_fft)
+        self.fft_in[:k] = samples[:k]; self.fft_in[k:] = 0.0 # overwrite_x pode sujar o padding
+        return np.abs(sfft.rfft(self.fft_in, overwrite_x=True, workers=1), out=self.mag)
+
+    def features(self, avg_bass):
+        """(e_bass, new_avg_bass, bass_ratio, harmonic_pos) do último `transform`."""
+        return process_block(self.mag, self.freqs_mid, self.bass_lo, self.bass_hi,
+                             self.mid_lo, self.mid_hi, avg_bass)
@@ -6,20 +6,45 @@ import colorsys
 import time
 import random
 import socket
-import os
 import signal
 import argparse
+from collections import deque
 from bleak import BleakScanner, BleakClient
+from audio_dsp import Spectrum
+from ble_tuning import tune_ble_adapter
 
 # --- Configurações ---
 DEVICE_ADDRESS = "C5:50:EB:E3:E5:D0" 
 DEVICE_NAME_FILTER = "Triones" 
 AUDIO_DEVICE_ID = None 
-SOCKET_PATH = "/tmp/silverblue_led.sock"
+WRITE_CHAR_UUID = "0000ffe9-0000-1000-8000-00805f9b34fb"
+SOCKET_PATH = "\0silverblue_led" # Namespace abstrato: sem arquivo para criar/apagar
 
 SAMPLE_RATE = 44100 
 BLOCK_SIZE = 2048
 MAX_BRIGHTNESS = 0.7 
+HUE_WINDOW = 20 # Blocos na média móvel do hue
+LED_TICK = 0.05 # Período do loop de cor do LED (s)
+LED_HEARTBEAT = 1.0 # Reenvia a cor mesmo sem mudança a cada N segundos
+BLE_STALL = 0.25 # Escrita BLE acima disso: pula a DSP até o writer voltar
+RGB_DEADBAND = 1 # Variação ≤1/255 em todos os canais é imperceptível: não reenvia
+HUE_LUT_SIZE = 1024 # Resolução da tabela de hue puro (potência de 2)
+SILENCE_FLOOR = 1e-6 * BLOCK_SIZE # Energia mínima por bloco (~-60 dBFS RMS)
+SILENCE_RATIO = 0.01 # Ou 1% da energia média recente
+SMOOTH_RATES = np.array([0.2, 0.2, 0.02], dtype=np.float32) # (brilho, sat, hue)
+
+# --- Detector de Onsets (Spectral Flux) ---
+FLUX_WINDOW = 21 # ~1s de blocos para a mediana adaptativa
+ONSET_THRESHOLD = 1.5 # Onset quando flux > C * mediana
+ONSET_DEBOUNCE = 0.06 # Segundos mínimos entre onsets
+
+# --- Parâmetros por Vibe: (red_priority, pastel_mode, mode_code) ---
+MODE_CHILL, MODE_PARTY, MODE_RAGE = 0, 1, 2
+VIBE_PARAMS = {
+    "CHILL": (False, False, MODE_CHILL),
+    "PARTY": (False, True, MODE_PARTY),
+    "RAGE":  (True, False, MODE_RAGE),
+}
 
 # --- Paletas por Vibe ---
 PALETTES_CHILL = [[0.5, 0.55, 0.6], [0.0, 0.05, 0.1], [0.25, 0.3, 0.35]]
@@ -28,15 +53,44 @@ PALETTES_RAGE  = [[0.0, 0.02, 0.98], [0.0, 0.0, 0.0]]
 
 class VibeEngine:
     def __init__(self):
-        self.onsets = []
+        self.onsets = deque(maxlen=256)
         self.current_vibe = "CHILL"
+        # Resolvidos só na troca de vibe, para o hot path não comparar strings
+        self.params = VIBE_PARAMS[self.current_vibe]
+        self.mode_code = self.params[2]
         self.last_switch = 0
-    
-    def analyze(self, indata, energy_ratio):
-        now = time.time()
-        if energy_ratio > 1.5:
-            self.onsets = [t for t in self.onsets if now - t < 5.0]
-            if not self.onsets or (now - self.onsets[-1] > 0.1): self.onsets.append(now)
+        self.set_bins(BLOCK_SIZE // 2 + 1)
+
+    def set_bins(self, n_bins):
+        # Estado do spectral flux: log-magnitude do bloco anterior + buffers de trabalho
+        self._prev_log_mag = np.zeros(n_bins, dtype=np.float32)
+        self._log_mag = np.zeros(n_bins, dtype=np.float32)
+        # Histórico de ~1s de flux para o limiar adaptativo (mediana)
+        self._flux_buf = np.zeros(FLUX_WINDOW, dtype=np.float32)
+        self._flux_idx = 0; self._flux_count = 0
+
+    def spectral_flux(self, mag):
+        # flux = Σ max(0, log|X(l)| - log|X(l-1)|), sem alocar arrays novos
+        np.log1p(mag, out=self._log_mag)
+        np.subtract(self._log_mag, self._prev_log_mag, out=self._prev_log_mag)
+        np.maximum(self._prev_log_mag, 0.0, out=self._prev_log_mag)
+        flux = float(self._prev_log_mag.sum())
+        self._prev_log_mag, self._log_mag = self._log_mag, self._prev_log_mag
+        return flux
+
+    def analyze(self, mag, now):
+        flux = self.spectral_flux(mag)
+        n = self._flux_count
+        median = np.partition(self._flux_buf[:n], n // 2)[n // 2] if n else 0.0
+        self._flux_buf[self._flux_idx] = flux
+        self._flux_idx = (self._flux_idx + 1) % FLUX_WINDOW
+        self._flux_count = min(n + 1, FLUX_WINDOW)
+
+        # Janela deslizante de 5s: onsets chegam em ordem, então basta podar pela esquerda
+        cutoff = now - 5.0
+        while self.onsets and self.onsets[0] <= cutoff: self.onsets.popleft()
+        if flux > (ONSET_THRESHOLD * median) + 1e-6:
+            if not self.onsets or (now - self.onsets[-1] > ONSET_DEBOUNCE): self.onsets.append(now)
         
         density = len(self.onsets) / 5.0
         
@@ -49,18 +103,27 @@ class VibeEngine:
             if new_vibe != self.current_vibe:
                 print(f"\n🧠 Vibe Shift: {self.current_vibe} -> {new_vibe} (Dens: {density:.1f})")
                 self.current_vibe = new_vibe
+                self.params = VIBE_PARAMS[new_vibe]
+                self.mode_code = self.params[2]
                 self.last_switch = now
-        return self.current_vibe
+        return self.params
 
 class LEDBLE:
     def __init__(self, device):
         self.device = device
         self.client = None
+        self._char = WRITE_CHAR_UUID # Trocado pelo objeto da característica após conectar
 
     async def connect(self):
         if self.client and self.client.is_connected: return
         self.client = BleakClient(self.device)
         await self.client.connect()
+        # Resolve a característica uma vez: write_gatt_char não refaz a busca por UUID a cada escrita
+        char = self.client.services.get_characteristic(WRITE_CHAR_UUID)
+        if char is None: self._char = WRITE_CHAR_UUID; return
+        if "write-without-response" not in char.properties:
+            print(f"⚠️ {WRITE_CHAR_UUID} sem write-without-response: {char.properties}")
+        self._char = char
 
     async def disconnect(self):
         if self.client and self.client.is_connected:
@@ -68,16 +131,16 @@ class LEDBLE:
             await self.client.disconnect()
 
     async def set_rgb(self, rgb):
-        r, g, b = rgb
-        packet = [0x56, r, g, b, 0x00, 0xF0, 0xAA]
-        await self.send_bytes(packet)
+        # Pacote novo e imutável por chamada: send_bytes pode suspender (connect/retry) e
+        # outro chamador (ping, writer) não pode trocar a cor no meio da escrita
+        await self.send_bytes(bytes((0x56, rgb[0], rgb[1], rgb[2], 0x00, 0xF0, 0xAA)))
     
-    async def turn_on(self): await self.send_bytes([0xCC, 0x23, 0x33])
+    async def turn_on(self): await self.send_bytes(bytearray([0xCC, 0x23, 0x33]))
 
     async def send_bytes(self, data):
         if not self.client or not self.client.is_connected: await self.connect()
-        try: await self.client.write_gatt_char("0000ffe9-0000-1000-8000-00805f9b34fb", bytearray(data), response=False)
-        except: await self.connect(); await self.client.write_gatt_char("0000ffe9-0000-1000-8000-00805f9b34fb", bytearray(data), response=False)
+        try: await self.client.write_gatt_char(self._char, data, response=False)
+        except: await self.connect(); await self.client.write_gatt_char(self._char, data, response=False)
 
 class AudioReactive:
     def __init__(self):
@@ -85,25 +148,54 @@ class AudioReactive:
         self.running = True
         self.vibe = VibeEngine()
         
-        self.current_brightness = 0.0
         self.target_brightness = 0.0
-        self.current_hue = 0.0
         self.target_hue = 0.0
-        self.current_sat = 1.0
         self.target_sat = 1.0
+        # Estado suavizado (brilho, saturação, hue) e seus alvos, como vetores
+        self._smooth_state = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+        self._smooth_target = np.zeros(3, dtype=np.float32)
         
+        # Paletas indexadas pelo mode_code do vibe (sem if-chain por bloco)
+        self._palettes = {MODE_CHILL: np.array(PALETTES_CHILL, dtype=np.float32),
+                          MODE_PARTY: np.array(PALETTES_PARTY, dtype=np.float32),
+                          MODE_RAGE: np.array(PALETTES_RAGE, dtype=np.float32)}
         self.current_palette_idx = 0
-        self.palette_timer = time.time()
+        self.palette_timer = time.monotonic()
         self.avg_bass = 10.0
         self.peak_hold = 0.0
-        self.hue_stack = []
+        # Ring buffer + soma corrente: média móvel do hue em O(1)
+        self._hue_buf = np.zeros(HUE_WINDOW, dtype=np.float64)
+        self._hue_idx = 0; self._hue_sum = 0.0; self._hue_count = 0
         self.last_flash_time = 0
         self.red_channel = 0.0
         
         self.override_mode = False
+        # Última cor escrita no LED: evita reenviar o mesmo RGB a cada tick
+        self._last_rgb = None # Última cor enviada; None força o próximo envio (inclusive preto)
+        self._last_write = 0.0
+        # Caixa de correio de uma vaga: o writer BLE só vê a cor mais recente
+        self._pending_rgb = None
+        self._rgb_event = asyncio.Event()
+        self._ble_busy_since = 0.0 # Início da escrita BLE em andamento (0 = writer ocioso)
+        self._avg_energy = 0.0 # Energia média recente dos blocos (EWMA)
+        # Blocos de áudio vindos do callback; maxlen=2 descarta o mais antigo se a DSP atrasar
+        self._blocks = deque(maxlen=2)
+        self._block_event = asyncio.Event()
+        self._loop = None
+        self._tick_handle = None
+        self._stopped = asyncio.Event() # Sinaliza o fim da cadeia de ticks do LED
+        self._pings = set() # Tasks de handle_ping em andamento (referência forte até terminar)
+        # Tabela de hue puro (S=V=1); S e V entram depois com poucas multiplicações
+        self._hue_lut = np.array([colorsys.hsv_to_rgb(i / HUE_LUT_SIZE, 1.0, 1.0) for i in range(HUE_LUT_SIZE)], dtype=np.float32)
+        self._init_spectrum(BLOCK_SIZE, SAMPLE_RATE)
+
+    def _init_spectrum(self, n, sr):
+        self._spectrum = Spectrum(n, sr)
+        self.vibe.set_bins(len(self._spectrum.mag))
 
     async def connect(self):
         print(f"🔍 Conectando a {DEVICE_ADDRESS}...")
+        tune_ble_adapter()
         try:
             # Tenta desconectar qualquer sessão zumbi anterior
             device = await BleakScanner.find_device_by_address(DEVICE_ADDRESS, timeout=5.0)
@@ -125,6 +217,8 @@ class AudioReactive:
     async def shutdown(self):
         print("\n🛑 Encerrando serviço...")
         self.running = False
+        if self._tick_handle: self._tick_handle.cancel()
+        self._stopped.set()
         if self.led:
             try:
                 # Apaga o LED antes de sair
@@ -134,40 +228,45 @@ class AudioReactive:
                 print("🔌 Desconectado com sucesso.")
             except: pass
         
-        if os.path.exists(SOCKET_PATH): os.remove(SOCKET_PATH)
         print("👋 Tchau!")
         asyncio.get_event_loop().stop()
 
     def get_color_from_vibe(self, intensity):
-        if self.vibe.current_vibe == "RAGE": palettes = PALETTES_RAGE
-        elif self.vibe.current_vibe == "PARTY": palettes = PALETTES_PARTY
-        else: palettes = PALETTES_CHILL
+        palettes = self._palettes[self.vibe.mode_code]
         palette = palettes[self.current_palette_idx % len(palettes)]
-        if intensity < 0.33: return palette[0]
-        elif intensity < 0.66: return palette[1]
-        else: return palette[2]
+        return float(palette[min(int(intensity * len(palette)), len(palette) - 1)])
+
+    def _decay(self):
+        # Bloco descartado (silêncio ou BLE travado): só deixa o pico cair
+        self.red_channel = 0.0; self.target_sat = 1.0
+        self.peak_hold = max(self.peak_hold - 0.05, 0)
+        self.target_brightness = min(self.peak_hold, 1.0) * MAX_BRIGHTNESS
 
     def process_audio(self, indata):
         if self.override_mode: return
 
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))
-        freqs = np.fft.rfftfreq(len(indata), 1/SAMPLE_RATE)
-        
-        mask_bass = (freqs > 40) & (freqs < 150)
-        mask_mid  = (freqs > 200) & (freqs < 3000)
-        e_bass = np.sum(fft_data[mask_bass]) if np.any(mask_bass) else 0
-        
-        self.avg_bass = (self.avg_bass * 0.99) + (e_bass * 0.01)
-        bass_ratio = e_bass / max(self.avg_bass, 0.1)
-        
-        current_mode = self.vibe.analyze(indata, bass_ratio)
+        now = time.monotonic() # Um relógio por bloco, repassado aos helpers
+        if (now - self.palette_timer > 60.0) and (self.target_brightness < 0.2):
+            self.current_palette_idx += 1; self.palette_timer = now
+
+        # Back-pressure: com o BLE travado numa escrita, ninguém vai ver o resultado da FFT
+        if self._ble_busy_since and now - self._ble_busy_since > BLE_STALL:
+            self._decay(); return
+
+        # Gate de silêncio no domínio do tempo: um dot product custa bem menos que a FFT
+        mono = indata.reshape(-1) # channels=1: view contíguo, sem cópia
+        energy = float(np.dot(mono, mono))
+        threshold = max(SILENCE_FLOOR, SILENCE_RATIO * self._avg_energy)
+        # A média acompanha também os blocos silenciosos: depois de baixar o volume
+        # em mais de 20 dB o limiar cai junto e o gate volta a abrir
+        self._avg_energy = (self._avg_energy * 0.99) + (energy * 0.01)
+        if energy < threshold:
+            self._decay(); return
+
+        fft_data = self._spectrum.transform(mono)
+        e_bass, self.avg_bass, bass_ratio, harmonic_pos = self._spectrum.features(self.avg_bass)
         
-        if current_mode == "RAGE":
-            red_priority = True; pastel_mode = False
-        elif current_mode == "PARTY":
-            red_priority = False; pastel_mode = True
-        else: 
-            red_priority = False; pastel_mode = False
+        red_priority, pastel_mode, _ = self.vibe.analyze(fft_data, now)
 
         if bass_ratio < 0.5:
             target_bri = 0.1 
@@ -175,11 +274,11 @@ class AudioReactive:
             self.target_sat = 1.0
         else:
             norm = (bass_ratio - 0.5) / 2.0 
-            target_bri = 0.1 + (np.clip(norm, 0, 1.0) ** 2.0 * 0.9)
+            c = min(max(norm, 0.0), 1.0); target_bri = 0.1 + c * c * 0.9 # Curva quadrática sem pow/np.clip escalar
             if red_priority and target_bri > 0.4: self.red_channel = (target_bri - 0.4) * 2.0 
             else: self.red_channel = 0.0
             if pastel_mode:
-                sat_drop = np.clip(norm * 0.7, 0.0, 0.7)
+                sat_drop = min(max(norm * 0.7, 0.0), 0.7)
                 self.target_sat = 1.0 - sat_drop
             else: self.target_sat = 1.0
 
@@ -191,21 +290,26 @@ class AudioReactive:
         scaled_brightness = min(max(target_bri, self.peak_hold), 1.0) * MAX_BRIGHTNESS
         self.target_brightness = scaled_brightness
 
-        if self.target_brightness < (0.2 * MAX_BRIGHTNESS) and np.any(mask_mid):
-             valid_fft = fft_data[mask_mid]; valid_freqs = freqs[mask_mid]
-             centroid = np.sum(valid_freqs * valid_fft) / (np.sum(valid_fft) + 1e-6)
-             harmonic_pos = np.clip((centroid - 200) / 2800, 0.0, 1.0)
+        if self.target_brightness < (0.2 * MAX_BRIGHTNESS):
              raw_hue = self.get_color_from_vibe(harmonic_pos)
-             self.hue_stack.append(raw_hue)
-             if len(self.hue_stack) > 20: self.hue_stack.pop(0)
-             self.target_hue = sum(self.hue_stack) / len(self.hue_stack)
-
-        if (time.time() - self.palette_timer > 60.0) and (self.target_brightness < 0.2):
-            self.current_palette_idx += 1; self.palette_timer = time.time()
+             self._hue_sum += raw_hue - self._hue_buf[self._hue_idx]
+             self._hue_buf[self._hue_idx] = raw_hue
+             self._hue_idx = (self._hue_idx + 1) % HUE_WINDOW
+             self._hue_count = min(self._hue_count + 1, HUE_WINDOW)
+             self.target_hue = self._hue_sum / self._hue_count
 
     def audio_callback(self, indata, frames, time_info, status):
-        try: self.process_audio(indata)
-        except: pass
+        # Thread de tempo real do PortAudio: só copia o bloco e acorda o loop; a DSP roda em _dsp_loop
+        self._blocks.append(indata.copy())
+        self._loop.call_soon_threadsafe(self._block_event.set)
+
+    async def _dsp_loop(self):
+        while self.running:
+            await self._block_event.wait()
+            self._block_event.clear()
+            while self._blocks:
+                try: self.process_audio(self._blocks.popleft())
+                except: pass
 
     async def handle_ping(self, color_name):
         print(f"📩 PING: {color_name}")
@@ -234,59 +338,96 @@ class AudioReactive:
                 await asyncio.sleep(0.2)
             await asyncio.sleep(0.5)
         
+        self._last_rgb = None # O ping sobrescreveu a cor: força o próximo envio
         self.override_mode = False
 
     async def led_control_loop(self):
         print("💡 Loop LED iniciado...")
+        # Cadeia de call_later em vez de um while+sleep: sem frame de corrotina por tick
+        self._stopped.clear()
+        self._tick()
+        await self._stopped.wait()
+
+    def _tick(self):
+        if not self.running: self._stopped.set(); return
+        self._tick_handle = self._loop.call_later(LED_TICK, self._tick)
+        if self.override_mode or not self.led: return
+
+        # EWMA de (brilho, sat, hue) numa única operação vetorial
+        state = self._smooth_state
+        diff = self.target_hue - state[2]
+        if diff > 0.5: diff -= 1.0
+        elif diff < -0.5: diff += 1.0
+        self._smooth_target[:] = (self.target_brightness, self.target_sat, state[2] + diff)
+        state += SMOOTH_RATES * (self._smooth_target - state)
+        state[2] %= 1.0
+        bri, sat, hue = state.tolist()
+
+        # V*(1 - S*(1 - c)) nos três canais de uma vez
+        rgb = bri * (1.0 - sat * (1.0 - self._hue_lut[int(hue * HUE_LUT_SIZE) & (HUE_LUT_SIZE - 1)]))
+        if self.vibe.mode_code == MODE_RAGE:
+            rgb *= 1.0 - (self.red_channel * 0.8)
+            rgb[0] += self.red_channel * bri
+        np.minimum(rgb, 1.0, out=rgb)
+        if bri < 0.02: rgb[:] = 0.0
+
+        rgb8 = tuple((rgb * 255).astype(np.int32).tolist())
+        now = time.monotonic()
+        if (self._last_rgb is None or now - self._last_write > LED_HEARTBEAT
+                or max(abs(a - b) for a, b in zip(rgb8, self._last_rgb)) > RGB_DEADBAND):
+            self._last_rgb = rgb8; self._last_write = now
+            self._pending_rgb = rgb8; self._rgb_event.set()
+
+    async def _writer(self):
+        # Consome a caixa de correio: escritas lentas descartam frames antigos em vez de enfileirar
         while self.running:
-            if self.override_mode:
-                await asyncio.sleep(0.05); continue
-
-            if self.led:
-                self.current_brightness = (self.current_brightness * 0.8) + (self.target_brightness * 0.2)
-                
-                diff = self.target_hue - self.current_hue
-                if diff > 0.5: diff -= 1.0
-                elif diff < -0.5: diff += 1.0
-                self.current_hue = (self.current_hue + (diff * 0.02)) % 1.0 
-                
-                self.current_sat = (self.current_sat * 0.8) + (self.target_sat * 0.2)
-                r, g, b = colorsys.hsv_to_rgb(self.current_hue, self.current_sat, self.current_brightness)
-                
-                if self.vibe.current_vibe == "RAGE":
-                    ducking = 1.0 - (self.red_channel * 0.8)
-                    r = r * ducking + (self.red_channel * self.current_brightness)
-                    g *= ducking; b *= ducking
-                
-                r, g, b = min(1.0, r), min(1.0, g), min(1.0, b)
-                if self.current_brightness < 0.02: r, g, b = 0, 0, 0
-
-                try: await self.led.set_rgb((int(r*255), int(g*255), int(b*255)))
-                except: pass
-            
-            await asyncio.sleep(0.05)
+            await self._rgb_event.wait()
+            self._rgb_event.clear()
+            rgb, self._pending_rgb = self._pending_rgb, None
+            if rgb is None or not self.led: continue
+            self._ble_busy_since = time.monotonic()
+            try: await self.led.set_rgb(rgb)
+            except: self._last_rgb = None # Falhou: força reenvio no próximo tick
+            self._ble_busy_since = 0.0
     
     async def server_loop(self):
-        if os.path.exists(SOCKET_PATH): os.remove(SOCKET_PATH)
-        server = await asyncio.start_unix_server(self.handle_client, SOCKET_PATH)
-        print(f"👂 Socket server ativo: {SOCKET_PATH}")
-        async with server: await server.serve_forever()
-
-    async def handle_client(self, reader, writer):
-        data = await reader.read(100)
-        message = data.decode().strip()
-        if message.startswith("PING"):
-            parts = message.split(" ")
-            color = parts[1] if len(parts) > 1 else "green"
-            asyncio.create_task(self.handle_ping(color))
-        writer.close()
+        # Datagrama Unix: cada PING é um sendto só do cliente, sem connect/close
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try: sock.bind(SOCKET_PATH)
+        except OSError as e: sock.close(); print(f"⚠️ Socket indisponível: {e}"); return
+        sock.setblocking(False)
+        self._loop.add_reader(sock.fileno(), self._on_datagram, sock)
+        print(f"👂 Socket server ativo: @{SOCKET_PATH[1:]}")
+
+    def _on_datagram(self, sock):
+        # Um datagrama pode trazer vários comandos (send_ping_batch), um por linha
+        while True:
+            try: data = sock.recv(4096)
+            except (BlockingIOError, InterruptedError): return
+            for line in data.decode(errors="ignore").splitlines():
+                message = line.strip()
+                if message.startswith("PING"):
+                    parts = message.split(" ")
+                    color = parts[1] if len(parts) > 1 else "green"
+                    task = asyncio.create_task(self.handle_ping(color))
+                    self._pings.add(task); task.add_done_callback(self._pings.discard)
+
+    def _on_task_done(self, task):
+        # Tasks de fundo não deveriam terminar: se caírem, mostra o erro em vez de sumir calado
+        if not task.cancelled() and task.exception():
+            print(f"❌ Task {task.get_coro().__qualname__} parou: {task.exception()!r}")
 
     async def main(self):
-        loop = asyncio.get_running_loop()
+        loop = self._loop = asyncio.get_running_loop()
         for sig in (signal.SIGINT, signal.SIGTERM):
             loop.add_signal_handler(sig, lambda: asyncio.create_task(self.shutdown()))
 
-        asyncio.create_task(self.server_loop()) 
+        await self.server_loop()
+        # Referência forte: o loop só guarda referência fraca das tasks
+        self._writer_task = asyncio.create_task(self._writer())
+        self._writer_task.add_done_callback(self._on_task_done)
+        self._dsp_task = asyncio.create_task(self._dsp_loop())
+        self._dsp_task.add_done_callback(self._on_task_done)
         while self.running:
             if await self.connect():
                 try:
@@ -298,8 +439,9 @@ class AudioReactive:
                     dev_info = sd.query_devices(target_id, 'input')
                     global SAMPLE_RATE; SAMPLE_RATE = int(dev_info['default_samplerate'])
                     print(f"✅ Audio: {dev_info['name']}")
+                    self._init_spectrum(BLOCK_SIZE, SAMPLE_RATE)
                     
-                    stream = sd.InputStream(callback=self.audio_callback, device=target_id, channels=1, blocksize=BLOCK_SIZE, samplerate=SAMPLE_RATE)
+                    stream = sd.InputStream(callback=self.audio_callback, device=target_id, channels=1, blocksize=BLOCK_SIZE, samplerate=SAMPLE_RATE, dtype='float32')
                     with stream: await self.led_control_loop()
                 except Exception as e: print(f"❌ Erro Loop: {e}")
             
@@ -308,6 +450,9 @@ class AudioReactive:
                 await asyncio.sleep(5)
 
 if __name__ == "__main__":
+    # uvloop reduz o overhead do event loop no caminho BLE (opcional)
+    try: import uvloop; uvloop.install()
+    except ImportError: pass
     app = AudioReactive()
     try: asyncio.run(app.main())
     except KeyboardInterrupt: pass
@@ -2,11 +2,13 @@
 import asyncio
 import numpy as np
 import sounddevice as sd
-import colorsys
 import time
 import random
+import os
 from bleak import BleakScanner
 from led_ble import LEDBLE
+from audio_dsp import Spectrum, hsv2rgb
+from ble_tuning import tune_ble_adapter
 
 # --- Configurações ---
 DEVICE_ADDRESS = "C5:50:EB:E3:E5:D0" 
@@ -27,38 +29,65 @@ PALETTES = [
 
 SAMPLE_RATE = 44100 
 BLOCK_SIZE = 2048
+HUE_WINDOW = 20 # Blocos na média móvel do hue
+SILENCE_FLOOR = 1e-6 * BLOCK_SIZE # Energia mínima por bloco (~-60 dBFS RMS)
+
+RGB_DEADBAND = 1 # Variação ≤1/255 em todos os canais é imperceptível: não reenvia
+
+# --- Debug no terminal ---
+QUIET = os.environ.get("AUDIO_SYNC_QUIET") == "1" # AUDIO_SYNC_QUIET=1 desliga a barra
+PRINT_INTERVAL = 0.1 # Máx. 10 Hz: cada print é write+flush no thread de áudio
+BAR_WIDTH = 40
+BAR_FULL = '█' * BAR_WIDTH
+BAR_EMPTY = ' ' * BAR_WIDTH
 
 class AudioReactive:
     def __init__(self):
         self.led = None
         self.running = True
         
-        self.current_brightness = 0.0
         self.target_brightness = 0.0
-        self.current_hue = 0.0
         self.target_hue = 0.0
+        # Estado suavizado (brilho, hue), alvos e taxas como vetores float32
+        self._smooth_state = np.zeros(2, dtype=np.float32)
+        self._smooth_target = np.zeros(2, dtype=np.float32)
+        self._smooth_rates = np.array([SMOOTHING_BRI, SMOOTHING_HUE], dtype=np.float32)
         self.current_palette_idx = 0
-        self.palette_timer = time.time()
+        self.palette_timer = time.monotonic()
         self.palette_duration = 60.0
         
         self.avg_bass_energy = 10.0
         self.peak_hold = 0.0
         self.peak_decay = 0.05
-        self.hue_stack = [] 
+        # Ring buffer + soma corrente: média móvel do hue em O(1)
+        self._hue_buf = np.zeros(HUE_WINDOW, dtype=np.float64)
+        self._hue_idx = 0
+        self._hue_sum = 0.0
+        self._hue_count = 0
         
         self.last_flash_time = 0
         self.flash_cooldown = 2.0
         
-        self.silence_timer = time.time()
+        self.silence_timer = time.monotonic()
         self.is_silence = False
         
         self.energy_history = [0.0] * 10
         self.dynamic_smoothing = 0.2
         self.red_channel = 0.0
         self.is_kicking = False # Flag para saber se estamos no kick
+        self._last_print = 0.0
+        self._last_rgb = None # Última cor enviada ao LED (None = força o próximo envio)
+        # Caixa de correio de uma vaga: o writer BLE só vê a cor mais recente
+        self._pending_rgb = None
+        self._rgb_event = asyncio.Event()
+        self._init_spectrum(BLOCK_SIZE, SAMPLE_RATE)
+
+    def _init_spectrum(self, n, sr):
+        self._spectrum = Spectrum(n, sr)
 
     async def connect(self):
         print(f"🔍 Conectando a {DEVICE_ADDRESS}...")
+        tune_ble_adapter()
         try:
             device = await BleakScanner.find_device_by_address(DEVICE_ADDRESS, timeout=5.0)
             if not device:
@@ -68,6 +97,7 @@ class AudioReactive:
             self.led = LEDBLE(device)
             await self.led.update()
             await self.led.turn_on()
+            self._last_rgb = None # Conexão nova: força o próximo envio
             print(f"✅ Conectado: {device.name}")
             return True
         except Exception:
@@ -82,17 +112,17 @@ class AudioReactive:
 
     def audio_callback(self, indata, frames, time_info, status):
         if status: pass
+        now = time.monotonic() # Um relógio por bloco, reusado em todos os timers
         
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))
-        freqs = np.fft.rfftfreq(len(indata), 1/SAMPLE_RATE)
-        
-        mask_bass = (freqs > 40) & (freqs < 150)
-        mask_harm = (freqs > 200) & (freqs < 3000)
-        
-        bass_energy = np.sum(fft_data[mask_bass]) if np.any(mask_bass) else 0
-        
-        self.avg_bass_energy = (self.avg_bass_energy * 0.99) + (bass_energy * 0.01)
-        bass_ratio = bass_energy / max(self.avg_bass_energy, 0.1)
+        mono = indata.reshape(-1) # channels=1: view contíguo
+        # Gate de silêncio no domínio do tempo: um dot product custa bem menos que a FFT
+        if float(np.dot(mono, mono)) < SILENCE_FLOOR:
+            # Equivale a um bloco sem grave: a média decai e o timer de silêncio segue contando
+            bass_energy, bass_ratio, harmonic_pos = 0.0, 0.0, 0.0
+            self.avg_bass_energy *= 0.99
+        else:
+            self._spectrum.transform(mono)
+            bass_energy, self.avg_bass_energy, bass_ratio, harmonic_pos = self._spectrum.features(self.avg_bass_energy)
         
         self.energy_history.append(bass_ratio)
         if len(self.energy_history) > 10: self.energy_history.pop(0)
@@ -100,10 +130,10 @@ class AudioReactive:
         self.dynamic_smoothing = 0.6 if variance > 0.1 else 0.1
 
         if bass_ratio < 0.2:
-            if not self.is_silence and (time.time() - self.silence_timer > 1.0):
+            if not self.is_silence and (now - self.silence_timer > 1.0):
                 self.is_silence = True
         else:
-            self.silence_timer = time.time()
+            self.silence_timer = now
             self.is_silence = False
 
         if self.is_silence:
@@ -117,11 +147,12 @@ class AudioReactive:
                 self.is_kicking = False
             else:
                 norm = (bass_ratio - 0.5) / 2.0 
-                target_bri = 0.1 + (np.clip(norm, 0, 1.0) ** 2.0 * 0.9)
+                c = min(max(norm, 0.0), 1.0)
+                target_bri = 0.1 + c * c * 0.9 # Curva quadrática sem pow/np.clip escalar
                 
                 if target_bri > 0.4:
                     self.red_channel = (target_bri - 0.4) * 2.0 
-                    self.red_channel = np.clip(self.red_channel, 0.0, 1.0)
+                    self.red_channel = min(max(self.red_channel, 0.0), 1.0)
                     self.is_kicking = True # Kick Ativo!
                 else:
                     self.red_channel = 0.0
@@ -133,50 +164,51 @@ class AudioReactive:
             self.peak_hold = max(self.peak_hold - self.peak_decay, 0)
         self.target_brightness = max(target_bri, self.peak_hold)
 
-        if self.target_brightness > 0.1 and np.any(mask_harm):
-            valid_fft = fft_data[mask_harm]
-            valid_freqs = freqs[mask_harm]
-            centroid = np.sum(valid_freqs * valid_fft) / (np.sum(valid_fft) + 1e-6)
-            harmonic_pos = np.clip((centroid - 200) / 2800, 0.0, 1.0)
+        if self.target_brightness > 0.1:
             raw_hue = self.get_target_color_from_palette(harmonic_pos)
-            self.hue_stack.append(raw_hue)
-            if len(self.hue_stack) > 20: self.hue_stack.pop(0)
-            self.target_hue = sum(self.hue_stack) / len(self.hue_stack)
+            self._hue_sum += raw_hue - self._hue_buf[self._hue_idx]
+            self._hue_buf[self._hue_idx] = raw_hue
+            self._hue_idx = (self._hue_idx + 1) % HUE_WINDOW
+            self._hue_count = min(self._hue_count + 1, HUE_WINDOW)
+            self.target_hue = self._hue_sum / self._hue_count
 
-        if (time.time() - self.palette_timer > self.palette_duration) and self.is_silence:
+        if (now - self.palette_timer > self.palette_duration) and self.is_silence:
             self.current_palette_idx = (self.current_palette_idx + 1) % len(PALETTES)
-            self.palette_timer = time.time()
+            self.palette_timer = now
             print(f"\n🎨 Nova Paleta: {self.current_palette_idx}")
 
-        bar = '█' * int(self.target_brightness * 40)
-        print(f"Bass:{bass_energy:5.0f} Bri:{self.target_brightness:4.2f} Red:{self.red_channel:4.2f} |{bar:<40}|", end='\r')
+        if QUIET: return
+        if now - self._last_print > PRINT_INTERVAL:
+            self._last_print = now
+            n = min(int(self.target_brightness * BAR_WIDTH), BAR_WIDTH)
+            bar = BAR_FULL[:n] + BAR_EMPTY[n:]
+            print(f"Bass:{bass_energy:5.0f} Bri:{self.target_brightness:4.2f} Red:{self.red_channel:4.2f} |{bar}|", end='\r')
 
     async def led_control_loop(self):
         print("💡 Loop Separação (Branco != Vermelho) iniciado...")
         while self.running:
             if self.led:
-                if self.target_brightness > 0.95:
-                    self.current_brightness = self.target_brightness 
-                else:
-                    smoothing = self.dynamic_smoothing
-                    self.current_brightness = (self.current_brightness * (1-smoothing)) + \
-                                            (self.target_brightness * smoothing)
-                
-                diff = self.target_hue - self.current_hue
-                if diff > 0.5: diff -= 1.0
-                elif diff < -0.5: diff += 1.0
-                self.current_hue = (self.current_hue + (diff * SMOOTHING_HUE)) % 1.0
+                # EWMA de (brilho, hue) numa única operação vetorial; pico > 0.95 entra direto
+                state = self._smooth_state
+                self._smooth_rates[0] = 1.0 if self.target_brightness > 0.95 else self.dynamic_smoothing
+                diff = self.target_hue - float(state[1])
+                diff -= round(diff) # Caminho mais curto no círculo de hue
+                self._smooth_target[0] = self.target_brightness
+                self._smooth_target[1] = state[1] + diff
+                state += self._smooth_rates * (self._smooth_target - state)
+                state[1] %= 1.0
+                bri, hue = state.tolist()
 
-                r_base, g_base, b_base = colorsys.hsv_to_rgb(self.current_hue, 1.0, self.current_brightness)
+                r_base, g_base, b_base = hsv2rgb(hue, 1.0, bri)
                 
                 # Ducking do Kick
                 ducking_factor = 1.0 - (self.red_channel * 0.8)
-                r_final = r_base * ducking_factor + (self.red_channel * self.current_brightness)
+                r_final = r_base * ducking_factor + (self.red_channel * bri)
                 g_final = g_base * ducking_factor
                 b_final = b_base * ducking_factor
                 
                 # --- Flash Branco (Condicional) ---
-                now = time.time()
+                now = time.monotonic()
                 # Só flash se NÃO estiver kickando (Vermelho)
                 if self.target_brightness > 0.95 and (now - self.last_flash_time) > self.flash_cooldown and not self.is_kicking:
                     r_final, g_final, b_final = 1.0, 1.0, 1.0
@@ -186,17 +218,40 @@ class AudioReactive:
                 g_final = min(1.0, g_final)
                 b_final = min(1.0, b_final)
 
-                if self.current_brightness < 0.02:
+                if bri < 0.02:
                     r_final, g_final, b_final = 0, 0, 0
 
-                try:
-                    await self.led.set_rgb((int(r_final*255), int(g_final*255), int(b_final*255)))
-                except Exception:
-                    pass
+                rgb = (int(r_final*255), int(g_final*255), int(b_final*255))
+                if (self._last_rgb is None
+                        or max(abs(a - b) for a, b in zip(rgb, self._last_rgb)) > RGB_DEADBAND):
+                    self._last_rgb = rgb
+                    self._pending_rgb = rgb
+                    self._rgb_event.set()
             
             await asyncio.sleep(0.05)
 
+    async def _writer(self):
+        # Consome a caixa de correio: escritas lentas descartam frames antigos em vez de enfileirar
+        while self.running:
+            await self._rgb_event.wait()
+            self._rgb_event.clear()
+            rgb, self._pending_rgb = self._pending_rgb, None
+            if rgb is None or not self.led:
+                continue
+            try:
+                await self.led.set_rgb(rgb)
+            except Exception:
+                self._last_rgb = None # Falhou: força reenvio no próximo tick
+
+    def _on_writer_done(self, task):
+        # O writer não deveria terminar: se cair, mostra o erro em vez de sumir calado
+        if not task.cancelled() and task.exception():
+            print(f"❌ Writer BLE parou: {task.exception()!r}")
+
     async def main(self):
+        # Referência forte: o loop só guarda referência fraca das tasks
+        self._writer_task = asyncio.create_task(self._writer())
+        self._writer_task.add_done_callback(self._on_writer_done)
         while True:
             if await self.connect():
                 try:
@@ -212,12 +267,14 @@ class AudioReactive:
                     dev_info = sd.query_devices(target_id, 'input')
                     SAMPLE_RATE = dev_info['default_samplerate']
                     print(f"✅ Audio: {dev_info['name']}")
+                    self._init_spectrum(BLOCK_SIZE, SAMPLE_RATE)
                     stream = sd.InputStream(
                         callback=self.audio_callback,
                         device=target_id,
                         channels=1, 
                         blocksize=BLOCK_SIZE,
-                        samplerate=SAMPLE_RATE
+                        samplerate=SAMPLE_RATE,
+                        dtype='float32'
                     )
                     stream.start()
                     await self.led_control_loop()
@@ -229,6 +286,12 @@ class AudioReactive:
             await asyncio.sleep(5)
 
 if __name__ == "__main__":
+    # uvloop reduz o overhead do event loop no caminho BLE (opcional)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     app = AudioReactive()
     try:
         asyncio.run(app.main())
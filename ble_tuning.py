@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Ajuste do intervalo de conexão BLE do adaptador (BlueZ / debugfs)."""
+import os
+
+HCI_DEBUGFS = "/sys/kernel/debug/bluetooth/{hci}"
+# Unidades de 1.25 ms: 6..12 = 7.5..15 ms (padrão do BlueZ: 30..50 ms)
+CONN_MIN_INTERVAL = 6
+CONN_MAX_INTERVAL = 12
+
+_tuned = False
+
+def tune_ble_adapter(hci="hci0"):
+    """Reduz o intervalo de conexão antes de conectar; só tem efeito como root.
+
+    Sem permissão (ou sem debugfs montado) não faz nada: o BlueZ segue com o padrão.
+    Roda uma vez por processo.
+    """
+    global _tuned
+    if _tuned: return
+    _tuned = True
+    base = HCI_DEBUGFS.format(hci=hci)
+    # min antes do max: o kernel rejeita max < min atual (padrão min=24, max=40)
+    for name, value in (("conn_min_interval", CONN_MIN_INTERVAL), ("conn_max_interval", CONN_MAX_INTERVAL)):
+        try:
+            with open(os.path.join(base, name), "w") as f: f.write(str(value))
+        except OSError:
+            pass
@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
 import asyncio
 import sys
-import json
 import colorsys
 import os
 import subprocess
 import threading
+import time
 import unicodedata
-from bleak import BleakScanner
-from led_ble import LEDBLE
+from functools import lru_cache
+# bleak/led_ble são importados só no primeiro scan/connect: a interface abre
+# antes de pagar o bootstrap do D-Bus/BlueZ
+
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    # Sem orjson: json da stdlib, compacto e em bytes como o orjson
+    import json
+    _dumps = lambda o: json.dumps(o, separators=(",", ":")).encode()
+    _loads = json.loads
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
@@ -22,6 +32,18 @@ CONFIG_DIR = os.environ.get("XDG_CONFIG_HOME", os.path.join(os.path.expanduser("
 APP_CONFIG_DIR = os.path.join(CONFIG_DIR, "controlador-led")
 os.makedirs(APP_CONFIG_DIR, exist_ok=True)
 SHORTCUTS_FILE = os.path.join(APP_CONFIG_DIR, "atalhos_v2.json")
+LAST_DEVICE_FILE = os.path.join(APP_CONFIG_DIR, "last_device.json") # Último LED conectado
+LAST_DEVICE_TIMEOUT = 2.0 # Busca direta pelo último LED antes do scan completo
+SCAN_TIMEOUT = 8.0 # Tempo máximo esperando o primeiro LED anunciar
+SCAN_FILTERED_TIMEOUT = 3.0 # Scan filtrado por serviço antes de cair no scan completo
+# Serviços GATT das famílias suportadas pelo led-ble (características ffd9/ffe9/ffd4/ffe4)
+KNOWN_LED_SVC_UUIDS = tuple(f"0000{part}-0000-1000-8000-00805f9b34fb" for part in ("ffd5", "ffe5", "ffd0", "ffe0"))
+SCAN_GRACE = 1.0 # Depois do primeiro LED, espera um pouco por outros (vários = pergunta ao usuário)
+# Prefixos de nome anunciados pelos controladores suportados pelo led-ble
+LED_NAME_PREFIXES = ("LEDnet", "BLE-LED", "LEDBLE", "Triones", "LEDBlue", "Dream~", "QHM-", "AP-")
+UPDATE_SENTINEL = os.path.join(APP_CONFIG_DIR, ".update_check") # mtime = última verificação
+UPDATE_INTERVAL = 86400 # Verifica atualizações no máximo uma vez por dia
+LED_SEND_DELAY = 0.05 # Intervalo mínimo entre envios BLE (máx. 20 Hz, borda inicial imediata)
 
 # Biblioteca de Presets Temáticos (HSV)
 PRESETS = {
@@ -45,6 +67,100 @@ PRESETS = {
     ]
 }
 
+def _hsv2rgb_int(h, s, v):
+    """HSV inteiro (0-255) -> RGB 0-255 pela tabela de 6 setores; sem floats."""
+    h6 = h * 6
+    region, f = (h6 // 255) % 6, h6 % 255
+    p = (v * (255 - s) + 127) // 255
+    q = (v * (65025 - s * f) + 32512) // 65025
+    t = (v * (65025 - s * (255 - f)) + 32512) // 65025
+    return ((v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q))[region]
+
+@lru_cache(maxsize=4096)
+def _hsv_to_rgb_hex(hq, sq, vq):
+    """HSV quantizado em 0-255 -> (r, g, b, "#RRGGBB"); eventos repetidos saem do cache."""
+    r, g, b = _hsv2rgb_int(hq, sq, vq)
+    return r, g, b, "#" + bytes((r, g, b)).hex().upper()
+
+APP_CSS = """
+Screen {
+    align: center middle;
+}
+
+#main_container {
+    width: 60;
+    height: auto;
+    border: thick $primary;
+    padding: 1;
+    background: $surface;
+}
+
+.preview {
+    width: 100%;
+    height: 3;
+    content-align: center middle;
+    margin: 1 0;
+    border: double white;
+}
+
+ColorBar {
+    margin: 0 0;
+    height: 1;
+}
+
+Label {
+    width: 100%;
+    content-align: center middle;
+}
+
+#shortcuts_grid {
+    layout: grid;
+    grid-size: 5;
+    grid-gutter: 1;
+    margin-top: 1;
+    height: auto;
+}
+
+#presets_container {
+    margin-top: 1;
+    border-top: dashed $primary;
+    padding-top: 1;
+    height: auto;
+}
+
+.preset-cat {
+    text-style: bold;
+    color: $accent;
+    margin-top: 1;
+}
+
+.shortcut-btn, .preset-btn {
+    min-width: 8;
+}
+
+#status {
+    background: $accent;
+    color: $text;
+    text-style: bold;
+    margin-bottom: 1;
+}
+"""
+
+# Grade fixa de atalhos (1..9, 0): rótulos e ids calculados uma vez na importação
+_SHORTCUT_LABELS = tuple(str(i % 10) for i in range(1, 11))
+_SHORTCUT_IDS = tuple(f"short_{lbl}" for lbl in _SHORTCUT_LABELS)
+
+def slugify(text):
+    return "".join(c for c in unicodedata.normalize('NFD', text)
+                   if unicodedata.category(c) != 'Mn').lower()
+
+def _preset_id(cat, name):
+    return f"pre_{cat}_{slugify(name)}"
+
+# id do botão -> (h, s, v), montado uma vez na importação
+_PRESET_HSV = {_preset_id(cat, it["name"]): (it["h"], it["s"], it["v"])
+               for cat, items in PRESETS.items() for it in items}
+
 class ColorBar(Static):
     """Um componente de barra de progresso que funciona como um slider customizado."""
     value = reactive(0.0)
@@ -54,78 +170,31 @@ class ColorBar(Static):
         self.label_text = label
         self.value = initial_value
         self.bar_color = color
+        self._bar_width = 20 # Atualizado no on_resize
+
+    _full_cache = {} # largura -> (cheia, vazia), compartilhado entre as barras
+
+    def on_resize(self, event):
+        width = event.size.width - 20
+        self._bar_width = width if width > 0 else 20
+        self.refresh()
 
     def render(self) -> str:
-        width = self.size.width - 20
-        if width <= 0: width = 20
+        width = self._bar_width
         filled = int(self.value * width)
-        bar = "█" * filled + "░" * (width - filled)
+        full, empty = self._strips(width)
+        bar = full[:filled] + empty[filled:]
         return f"{self.label_text:10} [{self.bar_color}]{bar}[/] {int(self.value * 100):3}%"
 
+    @classmethod
+    def _strips(cls, width):
+        strips = cls._full_cache.get(width)
+        if strips is None:
+            strips = cls._full_cache[width] = ("█" * width, "░" * width)
+        return strips
+
 class LEDControllerApp(App):
-    CSS = """
-    Screen {
-        align: center middle;
-    }
-
-    #main_container {
-        width: 60;
-        height: auto;
-        border: thick $primary;
-        padding: 1;
-        background: $surface;
-    }
-
-    .preview {
-        width: 100%;
-        height: 3;
-        content-align: center middle;
-        margin: 1 0;
-        border: double white;
-    }
-
-    ColorBar {
-        margin: 0 0;
-        height: 1;
-    }
-
-    Label {
-        width: 100%;
-        content-align: center middle;
-    }
-
-    #shortcuts_grid {
-        layout: grid;
-        grid-size: 5;
-        grid-gutter: 1;
-        margin-top: 1;
-        height: auto;
-    }
-
-    #presets_container {
-        margin-top: 1;
-        border-top: dashed $primary;
-        padding-top: 1;
-        height: auto;
-    }
-
-    .preset-cat {
-        text-style: bold;
-        color: $accent;
-        margin-top: 1;
-    }
-
-    .shortcut-btn, .preset-btn {
-        min-width: 8;
-    }
-    
-    #status {
-        background: $accent;
-        color: $text;
-        text-style: bold;
-        margin-bottom: 1;
-    }
-    """
+    CSS = APP_CSS
 
     TITLE = "Controlador LED Pro"
     BINDINGS = [
@@ -146,11 +215,8 @@ class LEDControllerApp(App):
     ]
 
     # Estado HSV reativo
-    hue = reactive(0.0)
-    sat = reactive(1.0)
-    val = reactive(1.0)
+    hsv = reactive((0.0, 1.0, 1.0)) # Uma notificação por ação, não três
     step = reactive(0.05) # Sensibilidade
-    status_msg = reactive("Iniciando...")
 
     def __init__(self, address=None):
         super().__init__()
@@ -158,14 +224,68 @@ class LEDControllerApp(App):
         self.led = None
         self.shortcuts = self.load_shortcuts()
         self.scan_result = []
+        self._device_cache = {} # address -> BLEDevice dos scans desta sessão
+        self._connect_lock = asyncio.Lock()
+        # Gravação dos atalhos: threads serializadas; a versão mais nova (_save_seq) sempre vence
+        self._save_lock = threading.Lock()
+        self._save_seq = 0
+        self._saved_seq = 0
+        self._last_device = None # Endereço gravado em LAST_DEVICE_FILE
+        # Throttle do BLE: cor pendente + evento lido pelo worker de escrita
+        self._pending_rgb = None
+        self._rgb_event = asyncio.Event()
+        self._last_sent_rgb = None # Última cor confirmada no LED
+        self._last_send_ts = 0.0 # loop.time() do último envio (throttle)
+        self._ui_dirty = False # Já há um _flush_ui agendado
+        self._save_mode = False # "x" pressionado: o próximo dígito salva o atalho
+        self._last_key = None # Último HSV quantizado (+ passo) aplicado à interface
+        # Widgets cacheados no on_mount
+        self._status = None
+        self._last_status = "Iniciando..."
+        self._preview = None
+        self._bars = ()
 
     def load_shortcuts(self):
-        if os.path.exists(SHORTCUTS_FILE):
+        try:
+            with open(SHORTCUTS_FILE, 'rb') as f:
+                shortcuts = _loads(f.read())
+        except (OSError, ValueError): return {}
+        # Pré-aquece o cache RGB/hex: carregar um atalho depois é só um acerto no lru_cache
+        for sc in shortcuts.values():
+            try: _hsv_to_rgb_hex(round(sc['h']*255), round(sc['s']*255), round(sc['v']*255))
+            except (KeyError, TypeError): pass
+        return shortcuts
+
+    def save_shortcut(self, slot):
+        entry = {"h": self.hue, "s": self.sat, "v": self.val}
+        if self.shortcuts.get(slot) == entry:
+            self.notify(f"Atalho {slot} já salvo")
+            return # Nada mudou: não reescreve o arquivo
+        self.shortcuts[slot] = entry
+        # Serializa aqui (dict pequeno) e grava o arquivo numa thread: o disco não trava a UI
+        data = _dumps(self.shortcuts)
+        self._save_seq += 1
+        seq = self._save_seq
+        self.run_worker(lambda: self._flush_shortcuts(data, seq), thread=True, group="save")
+        self.notify(f"Atalho {slot} salvo")
+
+    def _flush_shortcuts(self, data, seq):
+        # Escrita atômica: um crash no meio nunca deixa o JSON pela metade.
+        # O lock impede duas threads no mesmo .tmp (o replace de uma apagaria o arquivo da outra)
+        tmp = SHORTCUTS_FILE + ".tmp"
+        with self._save_lock:
+            if seq < self._saved_seq: return # Uma gravação mais nova já passou na frente
             try:
-                with open(SHORTCUTS_FILE, 'r') as f:
-                    return json.load(f)
-            except: return {}
-        return {}
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno()) # Dados no disco antes do rename, senão o replace pode expor um arquivo vazio
+                os.replace(tmp, SHORTCUTS_FILE)
+                self._saved_seq = seq
+            except OSError as e:
+                try: os.unlink(tmp)
+                except OSError: pass
+                self.call_from_thread(self.notify, f"Erro ao salvar atalhos: {e}", severity="error")
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -179,100 +299,259 @@ class LEDControllerApp(App):
             yield ColorBar("PASSO (P/O)", id="bar_step", color="green")
             
             yield Label("[b]Meus Atalhos[/b]")
-            with Container(id="shortcuts_grid"):
-                for i in range(1, 11):
-                    yield Button(str(i % 10), id=f"short_{i % 10}", classes="shortcut-btn")
+            # Containers montados já com os filhos: um único mount por grupo de botões
+            yield Container(*[Button(lbl, id=sid, classes="shortcut-btn")
+                              for lbl, sid in zip(_SHORTCUT_LABELS, _SHORTCUT_IDS)], id="shortcuts_grid")
             
             with Vertical(id="presets_container"):
                 yield Label("[b]Temas Prontos[/b]")
                 for cat, items in PRESETS.items():
                     yield Label(cat, classes="preset-cat")
-                    with Horizontal():
-                        for item in items:
-                            def slugify(text):
-                                return "".join(c for c in unicodedata.normalize('NFD', text)
-                                             if unicodedata.category(c) != 'Mn').lower()
-                            safe_name = slugify(item["name"])
-                            btn = Button(item["name"], id=f"pre_{cat}_{safe_name}", classes="preset-btn")
-                            btn.hsv_data = (item["h"], item["s"], item["v"])
-                            yield btn
+                    yield Horizontal(*[self._preset_button(cat, item) for item in items])
         yield Footer()
 
+    @staticmethod
+    def _preset_button(cat, item):
+        return Button(item["name"], id=_preset_id(cat, item["name"]), classes="preset-btn")
+
     async def on_mount(self):
+        # Referências fixas após o compose: evita um query_one por evento
+        self._status = self.query_one("#status", Label)
+        self._preview = self.query_one("#preview", Static)
+        self._bars = (self.query_one("#bar_hue", ColorBar), self.query_one("#bar_sat", ColorBar),
+                      self.query_one("#bar_val", ColorBar), self.query_one("#bar_step", ColorBar))
+        self._status.update(self._last_status)
         self.update_ui_elements()
+        self.run_worker(self.check_update(), group="update")
+        self.run_worker(self._ble_writer_loop(), name="ble_writer", group="ble_writer", exclusive=True)
         if self.address:
             await self.connect_to_device(self.address)
         else:
             self.run_worker(self.scan_and_connect)
 
+    async def _git(self, *args, timeout):
+        # git pelo event loop: sem thread só para esperar o subprocesso
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"} # Nunca trava pedindo credencial
+        proc = await asyncio.create_subprocess_exec("git", *args, cwd=SCRIPT_DIR, env=env,
+                                                    stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                                    stderr=subprocess.DEVNULL)
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return proc.returncode, out
+
+    async def check_update(self):
+        # Cache por mtime: git fetch é rede + subprocesso, não precisa rodar a cada abertura
+        try: age = time.time() - os.path.getmtime(UPDATE_SENTINEL)
+        except OSError: age = float("inf")
+        if age < UPDATE_INTERVAL: return
+        try:
+            code, _ = await self._git("fetch", timeout=5)
+            if code != 0: return
+            # Só um inteiro na saída: sem varrer o índice nem depender do idioma do git
+            code, out = await self._git("rev-list", "--count", "HEAD..@{u}", timeout=3)
+        except (OSError, asyncio.TimeoutError): return
+        # Sem o marcador (config somente leitura) só verifica de novo no próximo início
+        try: open(UPDATE_SENTINEL, 'w').close()
+        except OSError: pass
+        if code == 0 and out.strip().isdigit() and int(out) > 0:
+            self.notify("Nova versão disponível! Rode ~/.script/update.sh", timeout=10)
+
+    async def _scan(self, service_uuids, timeout):
+        # Para o scan logo após o primeiro LED (+ uma janela curta para detectar outros).
+        # Celulares/fones com nome não contam: só serviço GATT conhecido ou prefixo de nome de LED
+        from bleak import BleakScanner
+        found = {}
+        leds = {}
+        first = asyncio.Event()
+        known_svcs = set(KNOWN_LED_SVC_UUIDS)
+        def on_adv(device, adv):
+            if device.name and device.name != "Unknown":
+                found[device.address] = device
+                self._device_cache[device.address] = device
+                if device.name.startswith(LED_NAME_PREFIXES) or known_svcs.intersection(adv.service_uuids):
+                    leds[device.address] = device
+                    first.set()
+        scanner = BleakScanner(detection_callback=on_adv, service_uuids=service_uuids)
+        await scanner.start()
+        try:
+            await asyncio.wait_for(first.wait(), timeout=timeout)
+            await asyncio.sleep(SCAN_GRACE)
+        except asyncio.TimeoutError: pass
+        finally:
+            await scanner.stop()
+        # Algum LED reconhecido: só eles vão para a escolha; senão, todos com nome
+        return leds or found
+
+    def _load_last_device(self):
+        try:
+            with open(LAST_DEVICE_FILE, 'rb') as f: return _loads(f.read())["address"]
+        except (OSError, ValueError, KeyError, TypeError): return None
+
+    def _save_last_device(self, address):
+        # Só um atalho de inicialização: se não der para gravar, o próximo início faz o scan
+        tmp = LAST_DEVICE_FILE + ".tmp"
+        try:
+            with open(tmp, 'wb') as f: f.write(_dumps({"address": address}))
+            os.replace(tmp, LAST_DEVICE_FILE)
+        except OSError as e:
+            self.call_from_thread(self.notify, f"Não foi possível lembrar o LED: {e}", severity="warning")
+
     async def scan_and_connect(self):
-        self.status_msg = "Escaneando Bluetooth..."
-        devices = await BleakScanner.discover()
-        led_devices = [d for d in devices if d.name and d.name != "Unknown"]
+        # Mesma lâmpada da última vez: busca direta pelo endereço, sem esperar o scan completo
+        last = self._last_device = self._load_last_device()
+        if last:
+            from bleak import BleakScanner
+            self._set_status(f"Procurando {last}...")
+            device = await BleakScanner.find_device_by_address(last, timeout=LAST_DEVICE_TIMEOUT)
+            # Achou mas não conectou: segue para o scan normal
+            if device is not None and await self.connect_to_device(device=device): return
+        self._set_status("Escaneando Bluetooth...")
+        # Filtro por serviço primeiro (o controlador descarta o resto); nem todo LED anuncia os UUIDs
+        found = await self._scan(list(KNOWN_LED_SVC_UUIDS), SCAN_FILTERED_TIMEOUT)
+        if not found: found = await self._scan(None, SCAN_TIMEOUT)
+        led_devices = list(found.values())
         if len(led_devices) == 1:
-            await self.connect_to_device(led_devices[0].address)
+            await self.connect_to_device(device=led_devices[0])
         elif len(led_devices) > 1:
-            self.status_msg = "Múltiplos dispositivos encontrados."
+            self._set_status("Múltiplos dispositivos encontrados.")
         else:
-            self.status_msg = "Nenhum LED encontrado."
+            self._set_status("Nenhum LED encontrado.")
 
-    async def connect_to_device(self, address):
-        self.status_msg = f"Conectando a {address}..."
+    async def connect_to_device(self, address=None, device=None):
+        # Um connect por vez: scan automático e ação do usuário não disputam o BlueZ
+        if device is not None: address = device.address
+        async with self._connect_lock:
+            # self.led só existe depois de um connect confirmado (ver _connect)
+            if self.led and self.led.address == address: return True
+            return await self._connect(address, device)
+
+    async def _connect(self, address, device=None):
+        # O LEDBLE já conecta via bleak-retry-connector (establish_connection + cache de serviços)
+        self._set_status(f"Conectando a {address}...")
+        led = None
         try:
-            device = await BleakScanner.find_device_by_address(address)
-            self.led = LEDBLE(device)
+            from bleak import BleakScanner
+            from led_ble import LEDBLE
+            # Já visto no scan: reaproveita o BLEDevice em vez de escanear de novo
+            if device is None: device = self._device_cache.get(address)
+            if device is None: device = await BleakScanner.find_device_by_address(address)
+            if device is None: raise RuntimeError(f"{address} não encontrado")
+            # Só publica em self.led depois do update/turn_on: um connect que falha não
+            # fica parecendo "já conectado" para o próximo connect_to_device
+            self.led = None
+            led = LEDBLE(device)
             try:
-                await self.led.update()
-                await self.led.turn_on()
+                await led.update()
+                await led.turn_on()
             except IndexError: pass
+            self.led = led
+            self._last_sent_rgb = None
             
-            if self.led.rgb:
-                r, g, b = self.led.rgb
+            if led.rgb:
+                r, g, b = led.rgb
                 h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
-                self.hue, self.sat, self.val = h, s, v
+                self.hsv = (h, s, v)
             
-            self.status_msg = f"CONECTADO: {device.name or address}"
+            self._set_status(f"CONECTADO: {device.name or address}")
+            if address != self._last_device:
+                self._last_device = address
+                self.run_worker(lambda: self._save_last_device(address), thread=True, group="save_device")
+            return True
         except Exception as e:
-            self.status_msg = f"ERRO: {e}"
+            self.led = None
+            if led is not None:
+                try: await led.stop()
+                except Exception: pass
+            self._set_status(f"ERRO: {e}")
+            return False
+
+    # Leitura por componente; a escrita passa por _set_hsv para disparar um único watcher
+    @property
+    def hue(self): return self.hsv[0]
+    @property
+    def sat(self): return self.hsv[1]
+    @property
+    def val(self): return self.hsv[2]
+
+    def _set_hsv(self, h=None, s=None, v=None):
+        hue, sat, val = self.hsv
+        self.hsv = (hue if h is None else h, sat if s is None else s, val if v is None else v)
 
-    def watch_hue(self): self.update_ui_elements()
-    def watch_sat(self): self.update_ui_elements()
-    def watch_val(self): self.update_ui_elements()
-    def watch_step(self): self.update_ui_elements()
-    def watch_status_msg(self, msg): self.query_one("#status").update(msg)
+    def watch_hsv(self): self._schedule_ui_update()
+    def watch_step(self): self._schedule_ui_update()
+
+    def _schedule_ui_update(self):
+        # Várias mudanças no mesmo ciclo de mensagens viram um único update_ui_elements
+        if self._ui_dirty: return
+        self._ui_dirty = True
+        self.call_later(self._flush_ui)
+
+    def _flush_ui(self):
+        self._ui_dirty = False
+        self.update_ui_elements()
+    def _set_status(self, msg):
+        # Texto puramente cosmético: escreve direto no Label, sem a maquinaria reativa
+        if msg == self._last_status: return
+        self._last_status = msg
+        if self._status: self._status.update(msg)
 
     def update_ui_elements(self):
-        r, g, b = colorsys.hsv_to_rgb(self.hue, self.sat, self.val)
-        hex_color = f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
+        key = (round(self.hue*255), round(self.sat*255), round(self.val*255), self.step)
+        if key == self._last_key: return # Nada visível mudou: sem queries, estilos nem BLE
+        r, g, b, hex_color = _hsv_to_rgb_hex(*key[:3])
         
         try:
-            preview = self.query_one("#preview")
-            preview.styles.background = hex_color
-            preview.update(f"RGB: {int(r*255)}, {int(g*255)}, {int(b*255)} | HEX: {hex_color.upper()}")
+            self._preview.styles.background = hex_color
+            self._preview.update(f"RGB: {r}, {g}, {b} | HEX: {hex_color}")
             
-            self.query_one("#bar_hue").value = self.hue
-            self.query_one("#bar_sat").value = self.sat
-            self.query_one("#bar_val").value = self.val
-            self.query_one("#bar_step").value = self.step
+            bar_hue, bar_sat, bar_val, bar_step = self._bars
+            bar_hue.value = self.hue
+            bar_sat.value = self.sat
+            bar_val.value = self.val
+            bar_step.value = self.step
             
             if self.led:
-                self.run_worker(self.send_color_to_led(int(r*255), int(g*255), int(b*255)))
+                self._schedule_led_send((r, g, b))
+            self._last_key = key
         except: pass
 
-    async def send_color_to_led(self, r, g, b):
-        try: await self.led.set_rgb((r, g, b))
-        except: pass
+    def _schedule_led_send(self, rgb):
+        # Caixa de correio de uma vaga: o writer só vê a cor mais recente
+        self._pending_rgb = rgb
+        self._rgb_event.set()
+
+    async def _ble_writer_loop(self):
+        # Worker único: uma escrita GATT por vez, no máximo a cada LED_SEND_DELAY.
+        # Throttle com borda inicial e final: a primeira cor sai na hora, as seguintes
+        # a cada LED_SEND_DELAY enquanto a tecla estiver segurada, e a última sempre sai.
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._rgb_event.wait()
+            wait = self._last_send_ts + LED_SEND_DELAY - loop.time()
+            if wait > 0: await asyncio.sleep(wait) # Junta os eventos que chegarem nesse meio tempo
+            self._rgb_event.clear()
+            rgb, self._pending_rgb = self._pending_rgb, None
+            if rgb is None or not self.led or rgb == self._last_sent_rgb: continue
+            self._last_send_ts = loop.time()
+            try:
+                await self.led.set_rgb(rgb)
+                self._last_sent_rgb = rgb
+            except Exception: self._last_sent_rgb = None # Falhou: a próxima cor sempre é enviada
 
     # Ações de Teclado
-    def action_inc_hue(self): self.hue = (self.hue + self.step) % 1.0
-    def action_dec_hue(self): self.hue = (self.hue - self.step) % 1.0
-    def action_inc_sat(self): self.sat = min(1.0, self.sat + self.step)
-    def action_dec_sat(self): self.sat = max(0.0, self.sat - self.step)
-    def action_inc_val(self): self.val = min(1.0, self.val + self.step)
-    def action_dec_val(self): self.val = max(0.0, self.val - self.step)
+    def action_inc_hue(self): self._set_hsv(h=(self.hue + self.step) % 1.0)
+    def action_dec_hue(self): self._set_hsv(h=(self.hue - self.step) % 1.0)
+    def action_inc_sat(self): self._set_hsv(s=min(1.0, self.sat + self.step))
+    def action_dec_sat(self): self._set_hsv(s=max(0.0, self.sat - self.step))
+    def action_inc_val(self): self._set_hsv(v=min(1.0, self.val + self.step))
+    def action_dec_val(self): self._set_hsv(v=max(0.0, self.val - self.step))
     def action_inc_step(self): self.step = min(0.5, self.step + 0.01)
     def action_dec_step(self): self.step = max(0.01, self.step - 0.01)
-    def action_reset(self): self.hue, self.sat, self.val = 0.0, 0.0, 1.0
+    def action_reset(self): self.hsv = (0.0, 0.0, 1.0)
 
     async def on_button_pressed(self, event: Button.Pressed):
         btn_id = event.button.id
@@ -280,19 +559,24 @@ class LEDControllerApp(App):
             slot = btn_id.split("_")[1]
             if slot in self.shortcuts:
                 s = self.shortcuts[slot]
-                self.hue, self.sat, self.val = s['h'], s['s'], s['v']
+                self.hsv = (s['h'], s['s'], s['v'])
                 self.notify(f"Atalho {slot} carregado")
             else:
                 self.notify(f"Slot {slot} vazio. Use X + Número para salvar.")
         elif btn_id.startswith("pre_"):
-            self.hue, self.sat, self.val = event.button.hsv_data
+            self.hsv = _PRESET_HSV[btn_id]
             self.notify(f"Tema aplicado!")
 
     def on_key(self, event):
+        if self._save_mode:
+            self._save_mode = False
+            if event.key.isdigit():
+                self.save_shortcut(event.key)
+                event.stop()
+            return
         if event.key == "x":
+            self._save_mode = True
             self.notify("Pressione o número (0-9) para salvar", timeout=2)
-            # Simplificação para salvar no modo teclado ASCII
-            pass
 
 if __name__ == "__main__":
     app = LEDControllerApp(sys.argv[1] if len(sys.argv) > 1 else None)
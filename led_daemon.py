@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Daemon que mantém uma única conexão BLE com o LED e recebe cores por socket Unix.
+
+mic_sync.py e screen_sync.py usam o daemon automaticamente quando ele está rodando
+(DaemonLED.connect); sem ele, cada script conecta direto no LED como antes.
+"""
+import asyncio
+import signal
+import socket
+from bleak import BleakScanner
+from led_ble import LEDBLE
+from ble_tuning import tune_ble_adapter
+
+# Configurações
+DEVICE_ADDRESS = "C5:50:EB:E3:E5:D0"
+# Namespace abstrato, separado do socket de PING do audio_sync.py
+DAEMON_SOCKET = "\0silverblue_led_rgb"
+# Quadro fixo: r, g, b, flags (flags reservado, sempre 0)
+FRAME_SIZE = 4
+RECONNECT_DELAY = 5.0
+
+class DaemonLED:
+    """Cliente do daemon com a parte da interface do LEDBLE que os scripts usam."""
+
+    name = "led_daemon"
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.rgb = None
+
+    @classmethod
+    def connect(cls):
+        # Datagrama conectado: falha na hora (ECONNREFUSED) se o daemon não estiver rodando
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.connect(DAEMON_SOCKET)
+        except OSError:
+            sock.close()
+            return None
+        sock.setblocking(False)
+        return cls(sock)
+
+    async def set_rgb(self, rgb):
+        # Um send por cor. Fila do daemon cheia levanta BlockingIOError (quadro não entregue:
+        # o chamador reenvia); daemon parado levanta ConnectionRefusedError (reconectar)
+        self._sock.send(bytes((rgb[0], rgb[1], rgb[2], 0)))
+        self.rgb = rgb
+
+    async def update(self):
+        pass
+
+    async def turn_on(self):
+        pass
+
+    async def stop(self):
+        # Mesmo nome do LEDBLE.stop: quem troca de conexão fecha qualquer uma do mesmo jeito
+        self._sock.close()
+
+    disconnect = stop
+
+class LEDDaemon:
+    def __init__(self):
+        self.led = None
+        self.running = True
+        # Caixa de correio de uma vaga: o writer só vê a cor mais recente
+        self._pending_rgb = None
+        self._rgb_event = asyncio.Event()
+        self._last_rgb = None # Última cor escrita no LED (pula escritas repetidas)
+
+    async def connect(self):
+        tune_ble_adapter()
+        print(f"🔍 Conectando a {DEVICE_ADDRESS}...")
+        try:
+            device = await BleakScanner.find_device_by_address(DEVICE_ADDRESS, timeout=5.0)
+            if not device:
+                print("❌ Dispositivo não encontrado. Aguardando...")
+                return False
+            self.led = LEDBLE(device)
+            self._last_rgb = None
+            await self.led.update()
+            await self.led.turn_on()
+            print(f"✅ Conectado: {device.name}")
+            return True
+        except Exception as e:
+            print(f"❌ Erro conexão: {e}")
+            self.led = None
+            return False
+
+    def _on_datagram(self, sock):
+        # Esvazia o socket e fica só com o último quadro: cores intermediárias são descartadas
+        frame = None
+        while True:
+            try:
+                data = sock.recv(FRAME_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            if len(data) == FRAME_SIZE:
+                frame = data
+        if frame is not None:
+            self._pending_rgb = (frame[0], frame[1], frame[2])
+            self._rgb_event.set()
+
+    async def _writer(self):
+        # Uma escrita GATT por vez, no ritmo que o link BLE aguentar
+        while self.running:
+            if not self.led:
+                if not await self.connect():
+                    await asyncio.sleep(RECONNECT_DELAY)
+                    continue
+                if self._pending_rgb is not None:
+                    self._rgb_event.set() # Reenvia a última cor pedida antes da queda
+            await self._rgb_event.wait()
+            self._rgb_event.clear()
+            rgb = self._pending_rgb
+            if rgb is None or rgb == self._last_rgb:
+                continue
+            try:
+                await self.led.set_rgb(rgb)
+                self._last_rgb = rgb
+            except Exception as e:
+                print(f"Erro BLE: {e}")
+                # Força reconexão; a cor pendente é reenviada depois
+                led, self.led = self.led, None
+                try:
+                    await led.stop()
+                except Exception:
+                    pass
+
+    async def shutdown(self):
+        self.running = False
+        if self.led:
+            try:
+                await self.led.stop()
+            except Exception:
+                pass
+
+    async def main(self):
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.bind(DAEMON_SOCKET)
+        except OSError as e:
+            sock.close()
+            print(f"❌ Daemon LED já está rodando (@{DAEMON_SOCKET[1:]}): {e}")
+            return
+        sock.setblocking(False)
+        loop.add_reader(sock.fileno(), self._on_datagram, sock)
+        print(f"👂 Daemon LED ativo: @{DAEMON_SOCKET[1:]}")
+
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        writer = asyncio.create_task(self._writer())
+        await stop.wait()
+
+        loop.remove_reader(sock.fileno())
+        sock.close()
+        writer.cancel()
+        await self.shutdown()
+        print("\n👋 Parando...")
+
+if __name__ == "__main__":
+    # uvloop reduz o overhead do event loop no caminho BLE (opcional)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(LEDDaemon().main())
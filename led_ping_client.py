@@ -1,24 +1,32 @@
 #!/usr/bin/env python3
-import asyncio
 import sys
 import socket
 
-SOCKET_PATH = "/tmp/silverblue_led.sock"
+SOCKET_PATH = "\0silverblue_led" # Namespace abstrato (mesmo do audio_sync.py)
 
-async def send_ping(color="green"):
+# Socket de datagrama reaproveitado entre chamadas no mesmo processo
+_sock = None
+
+def _get_sock():
+    global _sock
+    if _sock is None: _sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    return _sock
+
+def send_ping(color="green"):
+    send_ping_batch([color])
+
+def send_ping_batch(colors):
+    # Um datagrama com todos os comandos, um por linha: um sendto só, sem conexão
+    messages = [f"PING {c}" for c in colors]
     try:
-        reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
-        message = f"PING {color}"
-        writer.write(message.encode())
-        await writer.drain()
-        writer.close()
-        await writer.wait_closed()
-        print(f"✅ Comando enviado: {message}")
-    except FileNotFoundError:
+        _get_sock().sendto("".join(m + "\n" for m in messages).encode(), SOCKET_PATH)
+        for message in messages: print(f"✅ Comando enviado: {message}")
+    except (FileNotFoundError, ConnectionRefusedError):
         print("❌ Serviço LED não está rodando (Socket não encontrado).")
     except Exception as e:
         print(f"❌ Erro ao conectar: {e}")
 
 if __name__ == "__main__":
-    color = sys.argv[1] if len(sys.argv) > 1 else "magenta"
-    asyncio.run(send_ping(color))
+    # Uma ou mais cores: `led_ping_client.py red blue` vai num único datagrama
+    colors = sys.argv[1:] or ["magenta"]
+    send_ping_batch(colors)
@@ -3,9 +3,11 @@ import asyncio
 import numpy as np
 import sounddevice as sd
 import colorsys
+import math
 import time
 from bleak import BleakScanner
 from led_ble import LEDBLE
+from led_daemon import DaemonLED
 
 # --- Configurações ---
 DEVICE_ADDRESS = "C5:50:EB:E3:E5:D0" 
@@ -14,6 +16,14 @@ AUDIO_DEVICE_ID = None
 MIN_VOL = 15.0  # Ajustado: O piso de ruído da máquina está em ~12.0
 MAX_VOL = 40.0  # Ajustado proporcionalmente
 SMOOTHING = 0.3 
+# Só o volume é lido: 22.05 kHz com blocos de 2048 = metade dos callbacks (~93 ms por bloco).
+# Blocos maiores (4096+) somariam mais ~90 ms de atraso na resposta da luz.
+# Se o dispositivo não aceitar 22.05 kHz, usa a taxa padrão dele com o bloco escalado para
+# os mesmos ~93 ms; a norma é normalizada para 2048 amostras (MIN_VOL/MAX_VOL continuam valendo).
+SAMPLE_RATE = 22050
+BLOCK_SIZE = 2048
+BLOCK_SECONDS = BLOCK_SIZE / SAMPLE_RATE
+DEBUG_INTERVAL = 0.2 # Período da barra de debug (s), fora do callback de áudio
 
 # Cor Base (Hue: 0-1.0)
 BASE_HUE = 0.08 
@@ -25,8 +35,21 @@ class AudioReactive:
         self.running = True
         self.current_brightness = 0.0
         self.target_brightness = 0.0
+        self.volume = 0.0 # Último volume medido (lido só pelo _debug_loop)
+        self._norm_scale = 1.0 # Corrige a norma para blocos de BLOCK_SIZE amostras
+        # Hue e saturação são fixos: só o brilho varia, então a cor sai de uma tabela de 256 níveis
+        self._lut = [tuple(int(c * 255) for c in colorsys.hsv_to_rgb(BASE_HUE, SATURATION, v / 255))
+                     for v in range(256)]
+        self._last_rgb = None # Última cor escrita no LED (pula escritas repetidas)
 
     async def connect(self):
+        # led_daemon.py rodando: usa a conexão BLE dele em vez de abrir outra
+        led = DaemonLED.connect()
+        if led:
+            self.led = led
+            self._last_rgb = None
+            print("✅ Usando led_daemon")
+            return True
         print(f"🔍 Conectando a {DEVICE_ADDRESS}...")
         try:
             device = await BleakScanner.find_device_by_address(DEVICE_ADDRESS, timeout=5.0)
@@ -38,6 +61,7 @@ class AudioReactive:
                 
             print(f"✅ Encontrado: {device.name}")
             self.led = LEDBLE(device)
+            self._last_rgb = None
             await self.led.update()
             await self.led.turn_on()
             return True
@@ -51,22 +75,27 @@ class AudioReactive:
         if status:
             print(f"⚠️ Status: {status}")
         
-        # Calcular volume (RMS)
-        volume = np.linalg.norm(indata) * 10
+        # Calcular volume (norma L2, a mesma escala de MIN_VOL/MAX_VOL)
+        # Produto escalar da view 1D: um sdot, sem o array temporário do linalg.norm
+        x = indata.reshape(-1)
+        volume = self.volume = math.sqrt(float(np.dot(x, x))) * 10 * self._norm_scale
         
-        # Mapear para 0.0 - 1.0
+        # Mapear para 0.0 - 1.0 (escalar: min/max em vez de np.clip)
         if volume < MIN_VOL:
             raw_val = 0.0
         else:
-            raw_val = np.clip((volume - MIN_VOL) / (MAX_VOL - MIN_VOL), 0, 1)
+            raw_val = min((volume - MIN_VOL) / (MAX_VOL - MIN_VOL), 1.0)
         
         # Aplicar curva gama 
         self.target_brightness = raw_val ** 2.0
 
-        # Debug Visual
-        bar_len = int(self.target_brightness * 40)
-        bar = '█' * bar_len
-        print(f"Vol: {volume:5.2f} Brilho: {self.target_brightness:4.2f} |{bar:<40}|", end='\r')
+    async def _debug_loop(self):
+        # Debug Visual: o print (GIL + syscall) sai da thread de tempo real do PortAudio
+        while self.running and self.led:
+            bar_len = int(self.target_brightness * 40)
+            bar = '█' * bar_len
+            print(f"Vol: {self.volume:5.2f} Brilho: {self.target_brightness:4.2f} |{bar:<40}|", end='\r')
+            await asyncio.sleep(DEBUG_INTERVAL)
 
     async def led_control_loop(self):
         print("💡 Loop reativo iniciado...")
@@ -80,21 +109,50 @@ class AudioReactive:
                     self.current_brightness = (self.current_brightness * SMOOTHING) + \
                                             (self.target_brightness * (1 - SMOOTHING))
                 
-                # Converter HSV -> RGB
+                # Converter HSV -> RGB (tabela pré-calculada)
                 if self.current_brightness < 0.01:
-                    v = 0
+                    rgb = self._lut[0]
                 else:
-                    v = self.current_brightness
-
-                r, g, b = colorsys.hsv_to_rgb(BASE_HUE, SATURATION, v)
+                    rgb = self._lut[min(int(self.current_brightness * 255), 255)]
                 
-                try:
-                    await self.led.set_rgb((int(r*255), int(g*255), int(b*255)))
-                except Exception as e:
-                    pass
+                # Silêncio ou brilho estável: a mesma cor não vai de novo para o BLE
+                if rgb != self._last_rgb:
+                    try:
+                        await self.led.set_rgb(rgb)
+                        self._last_rgb = rgb
+                    except BlockingIOError:
+                        self._last_rgb = None # Daemon ocupado: reenvia no próximo tick
+                    except ConnectionError as e:
+                        # Daemon parou (ou o link caiu): fecha e volta ao main para reconectar
+                        print(f"\n❌ Erro LED: {e}")
+                        self._last_rgb = None
+                        await self._drop_led()
+                        return
+                    except Exception as e:
+                        self._last_rgb = None # Falhou: reenvia no próximo tick
             
             await asyncio.sleep(0.05)
 
+    async def _drop_led(self):
+        # Fecha a conexão atual (LEDBLE ou socket do daemon) antes de tentar outra
+        led, self.led = self.led, None
+        if led:
+            try:
+                await led.stop()
+            except Exception:
+                pass
+
+    def _stream_params(self, device):
+        # Nem todo PipeWire/ALSA aceita 22.05 kHz: confere antes e cai na taxa padrão do dispositivo
+        try:
+            sd.check_input_settings(device=device, channels=1, dtype='float32', samplerate=SAMPLE_RATE)
+            return SAMPLE_RATE, BLOCK_SIZE
+        except Exception:
+            samplerate = sd.query_devices(device, 'input')['default_samplerate']
+            blocksize = max(256, int(round(samplerate * BLOCK_SECONDS)))
+            print(f"⚠️ {SAMPLE_RATE} Hz não suportado, usando {samplerate:.0f} Hz (bloco {blocksize})")
+            return samplerate, blocksize
+
     async def main(self):
         while True:
             if await self.connect():
@@ -111,15 +169,19 @@ class AudioReactive:
                         target_id = sd.default.device[0]
                         print(f"⚠️ Usando dispositivo padrão ID {target_id}")
 
+                    samplerate, blocksize = self._stream_params(target_id)
+                    self._norm_scale = math.sqrt(BLOCK_SIZE / blocksize)
                     stream = sd.InputStream(
                         callback=self.audio_callback,
                         device=target_id,
                         channels=1, 
-                        blocksize=2048
+                        samplerate=samplerate,
+                        blocksize=blocksize,
+                        dtype='float32'
                     )
                     stream.start()
                     
-                    await self.led_control_loop()
+                    await asyncio.gather(self.led_control_loop(), self._debug_loop())
                     
                 except Exception as e:
                     print(f"❌ Erro Fatal no Loop: {e}")
@@ -132,6 +194,12 @@ class AudioReactive:
             await asyncio.sleep(5)
 
 if __name__ == "__main__":
+    # uvloop reduz o overhead do event loop no caminho BLE (opcional)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     app = AudioReactive()
     try:
         asyncio.run(app.main())
@@ -27,6 +27,10 @@ elif [ "$1" == "strobe" ]; then
 elif [ "$1" == "screen" ]; then
     exec python3 "$BASE_DIR/screen_sync.py" "$@"
     
+elif [ "$1" == "daemon" ]; then
+    # Mantém uma conexão BLE compartilhada por mic/screen
+    exec python3 "$BASE_DIR/led_daemon.py"
+    
 elif [ "$1" == "audio" ]; then
     exec python3 "$BASE_DIR/audio_sync.py" "$@"
     
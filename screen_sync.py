@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 import asyncio
 import subprocess
-import io
+import re
 import time
-from PIL import Image
+import numpy as np
 from bleak import BleakScanner
 from led_ble import LEDBLE
+from led_daemon import DaemonLED
 
 # Configurações
 DEVICE_ADDRESS = "C5:50:EB:E3:E5:D0" 
 SCALE_FACTOR = 0.1 # Reduz resolução para processar rápido
+GRIM_CMD = ['grim', '-t', 'ppm', '-s', str(SCALE_FACTOR), '-']
+# Cabeçalho P6 binário: "P6 <largura> <altura> <maxval>" + um espaço, depois RGB24 cru
+PPM_HEADER = re.compile(rb"P6\s+(\d+)\s+(\d+)\s+(\d+)\s")
 SMOOTHING = 0.3 # Suavização da cor (0.0 a 1.0)
+FRAME_INTERVAL = 0.1 # 10 FPS é suficiente para ambilight ambiente
 
 class ScreenSync:
     def __init__(self):
@@ -19,8 +24,19 @@ class ScreenSync:
         self.current_r = 0.0
         self.current_g = 0.0
         self.current_b = 0.0
+        self._last_rgb = None # Última cor escrita no LED (pula escritas repetidas)
+        # Caixa de correio de uma vaga: a captura não espera o ACK do BLE
+        self._pending_rgb = None
+        self._rgb_event = asyncio.Event()
 
     async def connect(self):
+        # led_daemon.py rodando: usa a conexão BLE dele em vez de abrir outra
+        led = DaemonLED.connect()
+        if led:
+            self.led = led
+            self._last_rgb = None
+            print("✅ Usando led_daemon")
+            return True
         print(f"🔍 Conectando a {DEVICE_ADDRESS}...")
         try:
             device = await BleakScanner.find_device_by_address(DEVICE_ADDRESS, timeout=5.0)
@@ -29,6 +45,7 @@ class ScreenSync:
                 await asyncio.sleep(5)
                 return False
             self.led = LEDBLE(device)
+            self._last_rgb = None
             await self.led.update()
             await self.led.turn_on()
             print(f"✅ Conectado: {device.name}")
@@ -40,38 +57,76 @@ class ScreenSync:
 
     def get_screen_color(self):
         try:
-            # Captura com grim, saída PNG no stdout
-            # Reduz resolução logo na captura se possível? Grim não faz scale.
-            # Vamos capturar e o Pillow redimensiona.
-            
-            # grim -t jpeg -q 50 - | ... (JPEG é mais rápido que PNG para comprimir?)
-            # PNG é raw pixel data, talvez PPM seja mais rápido.
-            # Vamos de JPEG qualidade baixa.
-            
-            proc = subprocess.run(['grim', '-t', 'jpeg', '-q', '20', '-'], 
-                                  capture_output=True, check=True)
+            # Captura com grim, saída PPM no stdout
+            # PPM é o framebuffer cru com um cabeçalho curto: sem encode JPEG
+            # no grim nem decoder de imagem aqui, só a cópia dos pixels.
+            # -s reduz a imagem já no grim (SCALE_FACTOR=0.1 -> 1% dos pixels no pipe)
+            proc = subprocess.run(GRIM_CMD, capture_output=True, check=True)
             
-            img_data = io.BytesIO(proc.stdout)
-            img = Image.open(img_data)
+            buf = proc.stdout
+            m = PPM_HEADER.match(buf)
+            if not m: raise ValueError("saída do grim não é PPM P6")
+            w, h = int(m.group(1)), int(m.group(2))
             
-            # Redimensiona para 1x1 pixel usando resample (média)
-            img_small = img.resize((1, 1), resample=Image.Resampling.BOX)
-            color = img_small.getpixel((0, 0))
+            # Média direto nos bytes (view sem cópia), acumulando em inteiro
+            px = np.frombuffer(buf, dtype=np.uint8, count=w * h * 3, offset=m.end()).reshape(-1, 3)
+            color = px.sum(axis=0, dtype=np.uint64) // (w * h)
             
-            return color # (R, G, B)
+            return tuple(int(c) for c in color) # (R, G, B)
             
         except Exception as e:
             print(f"Erro captura: {e}")
             return (0, 0, 0)
 
+    async def _drop_led(self):
+        # Fecha a conexão atual (LEDBLE ou socket do daemon) antes de tentar outra
+        led, self.led = self.led, None
+        if led:
+            try:
+                await led.stop()
+            except Exception:
+                pass
+
+    async def _writer(self):
+        # Escrita GATT fora do caminho da captura; uma cor nova sobrescreve a que ainda não saiu
+        while self.running:
+            await self._rgb_event.wait()
+            self._rgb_event.clear()
+            rgb, self._pending_rgb = self._pending_rgb, None
+            if rgb is None or not self.led or rgb == self._last_rgb:
+                continue
+            try:
+                await self.led.set_rgb(rgb)
+                self._last_rgb = rgb
+            except BlockingIOError:
+                self._last_rgb = None # Daemon ocupado: o próximo quadro reenvia a cor
+            except Exception as e:
+                print(f"Erro BLE: {e}")
+                self._last_rgb = None
+                await self._drop_led() # Força reconexão
+
     async def loop(self):
         print("🖥️ Iniciando sincronização de tela (Grim)...")
+        self._writer_task = asyncio.create_task(self._writer())
+        try:
+            await self._capture_loop()
+        finally:
+            # Saída (Ctrl+C cancela esta task): o writer não fica órfão no meio de uma escrita
+            self.running = False
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _capture_loop(self):
+        monotonic = time.monotonic
+        deadline = monotonic()
         while self.running:
             if not self.led:
                 if not await self.connect():
+                    deadline = monotonic() # A reconexão não conta como atraso de quadro
                     continue
-
-            start_time = time.time()
             
             # 1. Capturar Cor
             # Executar em thread separada para não bloquear o loop async?
@@ -83,31 +138,37 @@ class ScreenSync:
             self.current_g = (self.current_g * SMOOTHING) + (g * (1 - SMOOTHING))
             self.current_b = (self.current_b * SMOOTHING) + (b * (1 - SMOOTHING))
             
-            # 3. Enviar
-            try:
-                # Boost de saturação/brilho opcional?
-                # Se for muito escuro, apaga
-                if (self.current_r + self.current_g + self.current_b) < 30:
-                    tr, tg, tb = 0, 0, 0
-                else:
-                    tr, tg, tb = int(self.current_r), int(self.current_g), int(self.current_b)
-                
-                await self.led.set_rgb((tr, tg, tb))
+            # 3. Enviar (via _writer: só a cor mais recente, sem travar a captura)
+            # Boost de saturação/brilho opcional?
+            # Se for muito escuro, apaga
+            if (self.current_r + self.current_g + self.current_b) < 30:
+                tr, tg, tb = 0, 0, 0
+            else:
+                tr, tg, tb = int(self.current_r), int(self.current_g), int(self.current_b)
+            
+            # Tela estática: a mesma cor não vai de novo para o BLE
+            rgb = (tr, tg, tb)
+            if rgb != self._last_rgb:
+                self._pending_rgb = rgb
+                self._rgb_event.set()
                 
                 # Debug
                 print(f"Cor: {tr:3} {tg:3} {tb:3} \x1b[48;2;{tr};{tg};{tb}m   \x1b[0m", end='\r')
-                
-            except Exception as e:
-                print(f"Erro BLE: {e}")
-                self.led = None # Força reconexão
             
             # Limitar FPS (Grim consome CPU)
-            # 10 FPS é suficiente para ambilight ambiente
-            elapsed = time.time() - start_time
-            sleep_time = max(0.1 - elapsed, 0.01)
-            await asyncio.sleep(sleep_time)
+            # Prazo monotônico acumulado: o ritmo não deriva com o tempo de captura/envio
+            deadline += FRAME_INTERVAL
+            now = monotonic()
+            if deadline < now: deadline = now # Atrasou um quadro inteiro: não tenta recuperar em rajada
+            await asyncio.sleep(deadline - now)
 
 if __name__ == "__main__":
+    # uvloop reduz o overhead do event loop no caminho BLE (opcional)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     app = ScreenSync()
     try:
         asyncio.run(app.loop())